@@ -0,0 +1,118 @@
+"""데이터 파일 탐색, Parquet 캐시, CSV 파싱 헬퍼와 로딩 결과 타입 (Streamlit에 의존하지 않음)"""
+import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pa_csv
+from pathlib import Path
+import unicodedata
+import glob
+import os
+import tempfile
+from typing import NamedTuple, Optional
+
+def build_file_index(root):
+    """root 이하 파일을 한 번만 순회해 NFC 정규화된 파일명 -> 경로 사전을 만든다."""
+    index = {}
+    stack = [root]
+    while stack:
+        with os.scandir(stack.pop()) as it:
+            for entry in it:
+                # .git, __pycache__ 등 숨김/캐시 폴더는 탐색하지 않음
+                if entry.name.startswith(('.', '__')):
+                    continue
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append(entry.path)
+                elif entry.is_file():
+                    index.setdefault(unicodedata.normalize('NFC', entry.name), Path(entry.path))
+    return index
+
+# 캐시 형식이나 파싱 방식이 바뀌면 올려서 기존 캐시를 모두 무효화
+CACHE_VERSION = 2
+
+def cache_path(cache_dir, name, src):
+    """원본의 (크기, mtime_ns)와 CACHE_VERSION을 파일명에 담은 캐시 경로.
+    mtime만 비교하면 더 오래된 mtime으로 복사된 원본이나 파싱 방식 변경을 감지하지 못함."""
+    st = src.stat()
+    return cache_dir / f"{name}.{st.st_size}-{st.st_mtime_ns}.v{CACHE_VERSION}.parquet"
+
+def prune_stale(cache):
+    """같은 원본에 대한 이전 키의 캐시 파일을 지운다."""
+    name = cache.name.split('.', 1)[0]
+    for p in cache.parent.glob(f"{glob.escape(name)}.*.parquet"):
+        if p != cache:
+            try:
+                p.unlink()
+            except OSError:
+                pass
+
+def write_cache(df, cache):
+    # 임시 파일에 쓴 뒤 교체해, 중단되거나 동시에 쓰더라도 잘린 캐시가 최신으로 보이지 않게 함
+    # 읽기 전용 배포 환경이거나 Parquet로 변환할 수 없는 데이터면 캐시 없이 진행
+    tmp = None
+    try:
+        cache.parent.mkdir(exist_ok=True)
+        with tempfile.NamedTemporaryFile(dir=cache.parent, suffix='.tmp', delete=False) as f:
+            tmp = f.name
+        df.to_parquet(tmp, engine='pyarrow', compression='zstd')
+        os.replace(tmp, cache)
+    except (OSError, pa.ArrowException):
+        if tmp is not None and os.path.exists(tmp):
+            os.remove(tmp)
+
+def read_cache(cache):
+    """Parquet 캐시를 읽는다. 손상된 캐시면 None을 반환해 원본을 다시 파싱하게 함."""
+    try:
+        return pd.read_parquet(str(cache), engine='pyarrow', memory_map=True)
+    except (OSError, pa.ArrowException):
+        return None
+
+def load_or_cache(src, cache_dir, name, reader):
+    """원본을 최초 1회만 파싱하고 이후 콜드 스타트에서는 Parquet 캐시를 읽는다."""
+    cache = cache_path(cache_dir, name, src)
+    if cache.exists():
+        df = read_cache(cache)
+        if df is not None:
+            return df
+    df = reader(src)
+    write_cache(df, cache)
+    if cache.exists():
+        prune_stale(cache)
+    return df
+
+def read_csv_mmap(path, encoding):
+    """pyarrow 멀티스레드 CSV 파서로 읽는다. 파이썬 파일 객체 대신 memory map을 입력으로 사용."""
+    # time은 학교별 형식이 달라 문자열로 고정
+    convert_options = pa_csv.ConvertOptions(column_types={'time': pa.string()})
+    with pa.memory_map(str(path)) as source:
+        return pa_csv.read_csv(source, read_options=pa_csv.ReadOptions(encoding=encoding),
+                               convert_options=convert_options)
+
+def read_env_csv(path):
+    # 인코딩 대응 (UTF-8 -> CP949 순서, UTF-8 BOM은 pyarrow가 건너뜀)
+    # UTF-8로 디코딩되지 않는 값 컬럼은 오류 없이 binary로 추론되므로 이 경우도 CP949로 재시도
+    try:
+        table = read_csv_mmap(path, 'utf-8')
+    except pa.ArrowException:
+        table = None
+    if table is None or any(pa.types.is_binary(t) for t in table.schema.types):
+        table = read_csv_mmap(path, 'cp949')
+    return table.to_pandas()
+
+def downcast_numeric(df, columns):
+    """수치 컬럼을 가장 작은 dtype(float32, int8 등)으로 축소해 메모리와 집계 비용을 줄인다."""
+    for c in columns:
+        if c in df:
+            kind = 'integer' if pd.api.types.is_integer_dtype(df[c]) else 'float'
+            df[c] = pd.to_numeric(df[c], downcast=kind)
+    return df
+
+class DashboardData(NamedTuple):
+    """load_all_data 결과. 필드는 이름으로 접근 (error가 있으면 나머지는 비어 있을 수 있음)
+    st.cache_data가 pickle로 저장하므로 스크립트(__main__)가 아닌 이 모듈에 정의함."""
+    env: Optional[dict] = None            # 학교 -> 환경 데이터
+    growth: Optional[dict] = None         # 학교 -> 생육 데이터
+    all_env: Optional[pd.DataFrame] = None
+    all_growth: Optional[pd.DataFrame] = None
+    env_summary: Optional[pd.DataFrame] = None
+    growth_agg: Optional[pd.DataFrame] = None
+    error: Optional[str] = None
+    load_errors: tuple = ()               # 일부 파일 로딩 실패 메시지 (화면 출력은 호출부에서 1회)
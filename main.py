@@ -1,11 +1,16 @@
 import streamlit as st
 import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pa_csv
 import plotly.express as px
 import plotly.graph_objects as go
-from plotly.subplots import make_subplots
 from pathlib import Path
 import unicodedata
 import io
+import re
+from concurrent.futures import ThreadPoolExecutor
+
+from data_io import DashboardData, build_file_index, load_or_cache, read_env_csv, downcast_numeric
 
 # --- 1. 페이지 설정 및 한글 폰트 설정 ---
 st.set_page_config(page_title="🌱 극지식물 최적 EC 농도 연구", layout="wide")
@@ -28,7 +33,16 @@ SCHOOL_INFO = {
     "동산고": {"ec_target": 8.0, "color": "#EF553B"}
 }
 
+# NFC 정규화는 모듈 로드 시 1회만 수행 (정규화된 이름 -> SCHOOL_INFO 키)
+NFC_SCHOOLS = {unicodedata.normalize('NFC', s): s for s in SCHOOL_INFO}
+ENV_FILE_NAMES = {s: unicodedata.normalize('NFC', f"{s}_환경데이터.csv") for s in SCHOOL_INFO}
+GROWTH_FILE_NAME = unicodedata.normalize('NFC', "4개교_생육결과데이터.xlsx")
+
+# 시트 이름에서 학교명을 찾는 정규식 (모듈 로드 시 1회 컴파일)
+SCHOOL_RE = re.compile("|".join(map(re.escape, NFC_SCHOOLS)))
+
 # --- 2. 데이터 로딩 함수 (경로 자동 탐색 및 정규화) ---
+# 파일 탐색/캐시/CSV 파싱 헬퍼는 data_io.py (Streamlit 없이 import·테스트 가능)
 @st.cache_data
 def load_all_data():
     # 현재 디렉토리 및 하위 디렉토리에서 'data' 폴더 찾기
@@ -39,72 +53,173 @@ def load_all_data():
     if (current_path / "data").is_dir():
         data_dir = current_path / "data"
     else:
-        # 2순위: 하위 디렉토리 어디든 'data'라는 이름의 폴더 탐색
-        for p in current_path.rglob("*"):
-            if p.is_dir() and p.name == "data":
+        # 2순위: 한 단계 아래 디렉토리의 data 폴더 (.git 등 전체 재귀 탐색은 하지 않음)
+        for p in current_path.glob("*/data"):
+            if p.is_dir():
                 data_dir = p
                 break
             
     if data_dir is None:
-        return None, None, "data 폴더를 찾을 수 없습니다."
+        return DashboardData(error="data 폴더를 찾을 수 없습니다.")
 
     env_dfs = {}
     growth_df_dict = {}
+    load_errors = []
 
-    def normalize_nfc(text):
-        return unicodedata.normalize('NFC', text)
-
-    # 모든 파일 목록 (재귀적 탐색)
-    all_files = list(data_dir.rglob("*"))
+    # 파일 인덱스 (한 번의 순회로 생성, 파일명 O(1) 조회)
+    file_index = build_file_index(data_dir)
+    # 파싱 결과 Parquet 캐시 폴더 (숨김 폴더라 파일 인덱스에서 제외됨)
+    cache_dir = data_dir / ".cache"
 
     # A. 환경 데이터 로드 (CSV)
-    for school in SCHOOL_INFO.keys():
-        target_name = f"{school}_환경데이터.csv"
-        found_file = next((f for f in all_files if normalize_nfc(target_name) in normalize_nfc(f.name)), None)
-        
-        if found_file:
-            try:
-                # 인코딩 대응 (UTF-8 -> CP949 순서)
-                try:
-                    df = pd.read_csv(found_file, encoding='utf-8-sig')
-                except:
-                    df = pd.read_csv(found_file, encoding='cp949')
-                df['school'] = school
-                env_dfs[school] = df
-            except Exception as e:
-                st.error(f"{school} CSV 로딩 실패: {e}")
+    def read_one(school):
+        found_file = file_index.get(ENV_FILE_NAMES[school])
+        if found_file is None:
+            return None
+        df = load_or_cache(found_file, cache_dir, f"{school}_환경데이터", read_env_csv)
+        df = downcast_numeric(df, ('temperature', 'humidity', 'ph', 'ec'))
+        df['school'] = pd.Categorical([school] * len(df), categories=list(SCHOOL_INFO))
+        return df
+
+    # 학교별 CSV는 서로 독립적이므로 병렬로 읽음 (파서가 GIL을 해제)
+    with ThreadPoolExecutor(max_workers=len(SCHOOL_INFO)) as ex:
+        futures = {school: ex.submit(read_one, school) for school in SCHOOL_INFO}
+    for school, future in futures.items():
+        try:
+            df = future.result()
+        except Exception as e:
+            load_errors.append(f"{school} CSV 로딩 실패: {e}")
+            continue
+        if df is not None:
+            env_dfs[school] = df
 
     # B. 생육 결과 데이터 로드 (XLSX)
-    growth_file_name = "4개교_생육결과데이터.xlsx"
-    found_growth_file = next((f for f in all_files if normalize_nfc(growth_file_name) in normalize_nfc(f.name)), None)
+    found_growth_file = file_index.get(GROWTH_FILE_NAME)
 
     if found_growth_file:
+        def read_workbook(path):
+            # calamine(Rust) 엔진으로 전체 시트를 한 번에 읽고 학교 시트를 하나의 표로 합침
+            # (캐시가 파일 하나라서 시트가 없는 학교가 있어도 매번 엑셀을 다시 열지 않음)
+            frames = []
+            for sheet, df in pd.read_excel(path, sheet_name=None, engine='calamine').items():
+                m = SCHOOL_RE.search(unicodedata.normalize('NFC', sheet))
+                if m:
+                    frames.append(df.assign(school=NFC_SCHOOLS[m.group(0)]))
+            return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=['school'])
+
         try:
-            xlsx = pd.ExcelFile(found_growth_file)
-            for sheet in xlsx.sheet_names:
-                norm_sheet = normalize_nfc(sheet)
-                school_match = next((s for s in SCHOOL_INFO.keys() if s in norm_sheet), None)
-                if school_match:
-                    df = pd.read_excel(xlsx, sheet_name=sheet)
-                    df['school'] = school_match
-                    df['ec_target'] = SCHOOL_INFO[school_match]['ec_target']
-                    growth_df_dict[school_match] = df
+            workbook = load_or_cache(found_growth_file, cache_dir, "생육결과데이터", read_workbook)
+            workbook['school'] = pd.Categorical(workbook['school'], categories=list(SCHOOL_INFO))
+            for school_match, df in workbook.groupby('school', observed=True):
+                df = df.reset_index(drop=True)
+                df['ec_target'] = SCHOOL_INFO[school_match]['ec_target']
+                growth_df_dict[school_match] = df
         except Exception as e:
-            st.error(f"엑셀 로딩 실패: {e}")
+            load_errors.append(f"엑셀 로딩 실패: {e}")
     else:
-        return env_dfs, growth_df_dict, "생육 결과 엑셀 파일을 찾을 수 없습니다."
+        return DashboardData(env=env_dfs, growth=growth_df_dict, error="생육 결과 엑셀 파일을 찾을 수 없습니다.",
+                             load_errors=tuple(load_errors))
+
+    # 탭마다 재실행되던 병합을 캐시 안에서 1회만 수행
+    all_env = pd.concat(env_dfs.values(), ignore_index=True) if env_dfs else pd.DataFrame()
+    all_growth = pd.concat(growth_df_dict.values(), ignore_index=True) if growth_df_dict else pd.DataFrame()
+
+    # 학교별 집계도 불변 데이터이므로 함께 캐시 (위젯 조작 시 재계산 방지)
+    env_summary = pd.DataFrame()
+    if env_dfs:
+        env_summary = all_env.groupby('school', observed=True, sort=False)[['temperature', 'humidity', 'ph', 'ec']].mean()
+        env_summary['ec_target'] = [SCHOOL_INFO[s]['ec_target'] for s in env_summary.index]
+    growth_agg = pd.DataFrame()
+    if growth_df_dict:
+        # 한 번의 groupby로 모든 지표를 집계
+        # (Categorical 코드 순 정렬 = SCHOOL_INFO 순서이므로 reindex 불필요)
+        growth_agg = all_growth.groupby('school', observed=True).agg(
+            mean_w=('생중량(g)', 'mean'), leaves=('잎 수(장)', 'mean'),
+            length=('지상부 길이(mm)', 'mean'), count=('개체번호', 'count'),
+        )
+
+    return DashboardData(env_dfs, growth_df_dict, all_env, all_growth, env_summary, growth_agg,
+                         load_errors=tuple(load_errors))
+
+# --- 차트 생성 함수 ---
+def facet_bar(summary, labels, height):
+    """학교별 집계표를 long-form으로 바꿔 지표별 facet 막대그래프 하나로 그린다."""
+    long_df = (summary[list(labels)].rename(columns=labels).rename_axis('학교').reset_index()
+               .melt(id_vars='학교', var_name='지표', value_name='값'))
+    fig = px.bar(
+        long_df, x='학교', y='값', facet_col='지표', facet_col_wrap=2,
+        category_orders={'학교': list(SCHOOL_INFO), '지표': list(labels.values())},
+        facet_row_spacing=0.12,
+    )
+    # color= 대신 막대 색을 직접 지정해 facet당 trace 1개만 유지
+    fig.for_each_trace(lambda t: t.update(marker_color=[SCHOOL_INFO[x]['color'] for x in t.x]))
+    # 지표마다 단위가 다르므로 y축은 독립적으로
+    fig.update_yaxes(matches=None, showticklabels=True, title_text="")
+    fig.update_xaxes(title_text="")
+    fig.for_each_annotation(lambda a: a.update(text=a.text.split("=", 1)[-1]))
+    fig.update_layout(height=height, font=dict(family="Malgun Gothic"), showlegend=False)
+    return fig
+
+# --- 다운로드 파일 생성 함수 ---
+@st.cache_data
+def env_csv_bytes(all_env):
+    """환경 데이터 CSV를 pyarrow writer로 바로 바이트 버퍼에 기록 (문자열 중간 복사 없음)"""
+    buf = io.BytesIO()
+    buf.write(b'\xef\xbb\xbf')  # 엑셀 한글 호환용 UTF-8 BOM
+    pa_csv.write_csv(pa.Table.from_pandas(all_env, preserve_index=False), buf)
+    return buf.getvalue()
+
+@st.cache_data
+def growth_xlsx_bytes(all_growth):
+    """생육 데이터 엑셀 파일을 1회만 생성 (xlsxwriter가 openpyxl보다 쓰기가 빠름)"""
+    buf = io.BytesIO()
+    with pd.ExcelWriter(buf, engine='xlsxwriter') as writer:
+        all_growth.to_excel(writer, index=False, sheet_name='Combined_Data')
+    return buf.getvalue()
 
-    return env_dfs, growth_df_dict, None
+@st.cache_data
+def growth_parquet_bytes(all_growth):
+    return all_growth.to_parquet(engine='pyarrow', index=False)
+
+# 그림은 데이터가 바뀌지 않는 한 동일하므로 st.cache_resource로 1회만 생성
+# (집계표를 인자로 받아 해시하므로, 캐시 초기화/TTL로 데이터가 바뀌면 다시 생성됨)
+@st.cache_resource
+def build_env_fig(env_summary):
+    fig = facet_bar(env_summary, {
+        'temperature': "평균 온도", 'humidity': "평균 습도", 'ph': "평균 pH", 'ec': "목표 vs 실측 EC"
+    }, height=600)
+    # 목표 EC는 마지막 facet(오른쪽 아래 = row 1, col 2)에 마커로 겹쳐 표시
+    fig.add_trace(go.Scatter(
+        x=env_summary.index, y=env_summary['ec_target'], mode='markers', name="목표",
+        marker=dict(symbol='line-ew-open', size=40, color='black', line=dict(width=3))
+    ), row=1, col=2)
+    return fig
+
+@st.cache_resource
+def build_growth_fig(growth_agg):
+    return facet_bar(growth_agg, {
+        'mean_w': "평균 생중량(g)", 'leaves': "평균 잎 수", 'length': "지상부 길이(mm)", 'count': "개체수"
+    }, height=700)
 
 # --- 3. 실행부 ---
 with st.spinner('📊 데이터를 분석하는 중입니다...'):
-    env_data, growth_data, error_msg = load_all_data()
+    data = load_all_data()
+
+# 로딩 오류는 캐시 함수 밖에서 표시 (load_all_data는 화면 요소 없이 데이터만 반환)
+for msg in data.load_errors:
+    st.error(msg)
 
-if error_msg:
-    st.error(f"❌ 오류 발생: {error_msg}")
+if data.error:
+    st.error(f"❌ 오류 발생: {data.error}")
     st.info("파일 구조 예시: `data/송도고_환경데이터.csv`, `data/4개교_생육결과데이터.xlsx`")
     st.stop()
 
+# 평균 생중량이 가장 높은 학교 (집계표에서 바로 조회)
+best_school, best_ec = None, None
+if not data.growth_agg.empty:
+    best_school = data.growth_agg['mean_w'].idxmax()
+    best_ec = SCHOOL_INFO[best_school]['ec_target']
+
 # --- 4. 대시보드 화면 구성 ---
 st.title("🌱 극지식물 최적 EC 농도 연구")
 selected_school = st.sidebar.selectbox("🏫 분석 대상 학교", ["전체"] + list(SCHOOL_INFO.keys()))
@@ -121,68 +236,40 @@ with tab1:
         
         summary_rows = []
         for s, info in SCHOOL_INFO.items():
-            count = len(growth_data[s]) if s in growth_data else 0
+            count = len(data.growth[s]) if s in data.growth else 0
             summary_rows.append({"학교": s, "목표 EC": info['ec_target'], "개체수": f"{count}개"})
         st.table(pd.DataFrame(summary_rows))
 
     with col2:
         st.subheader("주요 지표 (전체 평균)")
-        all_env = pd.concat(env_data.values())
         m1, m2 = st.columns(2)
         m3, m4 = st.columns(2)
-        m1.metric("평균 온도", f"{all_env['temperature'].mean():.1f} °C")
-        m2.metric("평균 습도", f"{all_env['humidity'].mean():.1f} %")
-        m3.metric("평균 pH", f"{all_env['ph'].mean():.2f}")
-        m4.metric("🏆 최적 EC", "2.0 (하늘고)", delta="생중량 최대")
+        m1.metric("평균 온도", f"{data.all_env['temperature'].mean():.1f} °C")
+        m2.metric("평균 습도", f"{data.all_env['humidity'].mean():.1f} %")
+        m3.metric("평균 pH", f"{data.all_env['ph'].mean():.2f}")
+        if best_school is not None:
+            m4.metric("🏆 최적 EC", f"{best_ec} ({best_school})", delta="생중량 최대")
 
 # --- Tab 2: 환경 데이터 ---
 with tab2:
     st.subheader("학교별 환경 지표 비교")
-    env_summary = []
-    for s, df in env_data.items():
-        env_summary.append({
-            "학교": s, "온도": df['temperature'].mean(), "습도": df['humidity'].mean(),
-            "pH": df['ph'].mean(), "실측EC": df['ec'].mean(), "목표EC": SCHOOL_INFO[s]['ec_target']
-        })
-    sum_df = pd.DataFrame(env_summary)
-
-    fig_env = make_subplots(rows=2, cols=2, subplot_titles=("평균 온도", "평균 습도", "평균 pH", "목표 vs 실측 EC"))
-    fig_env.add_trace(go.Bar(x=sum_df['학교'], y=sum_df['온도'], name="온도"), row=1, col=1)
-    fig_env.add_trace(go.Bar(x=sum_df['학교'], y=sum_df['습도'], name="습도"), row=1, col=2)
-    fig_env.add_trace(go.Bar(x=sum_df['학교'], y=sum_df['pH'], name="pH"), row=2, col=1)
-    fig_env.add_trace(go.Bar(x=sum_df['학교'], y=sum_df['목표EC'], name="목표"), row=2, col=2)
-    fig_env.add_trace(go.Bar(x=sum_df['학교'], y=sum_df['실측EC'], name="실측"), row=2, col=2)
-    
-    fig_env.update_layout(height=600, font=dict(family="Malgun Gothic"), showlegend=False)
-    st.plotly_chart(fig_env, use_container_width=True)
+    st.plotly_chart(build_env_fig(data.env_summary), use_container_width=True)
 
     with st.expander("원본 데이터 및 CSV 다운로드"):
-        st.dataframe(all_env)
-        st.download_button("CSV 다운로드", all_env.to_csv(index=False).encode('utf-8-sig'), "env_data.csv")
+        st.dataframe(data.all_env)
+        st.download_button("CSV 다운로드", env_csv_bytes(data.all_env), "env_data.csv")
 
 # --- Tab 3: 생육 결과 ---
 with tab3:
-    all_growth = pd.concat(growth_data.values())
-    
-    # 핵심 통계
-    st.info("💡 **하늘고(EC 2.0)**에서 생중량이 가장 높게 나타나, 해당 농도가 최적임을 시사합니다.")
-    
-    fig_growth = make_subplots(rows=2, cols=2, subplot_titles=("평균 생중량(g)", "평균 잎 수", "지상부 길이(mm)", "개체수"))
-    agg_g = all_growth.groupby('school').mean(numeric_only=True).reindex(list(SCHOOL_INFO.keys()))
-    agg_c = all_growth.groupby('school').size().reindex(list(SCHOOL_INFO.keys()))
-    
-    colors = [info['color'] for info in SCHOOL_INFO.values()]
-    fig_growth.add_trace(go.Bar(x=agg_g.index, y=agg_g['생중량(g)'], marker_color=colors), row=1, col=1)
-    fig_growth.add_trace(go.Bar(x=agg_g.index, y=agg_g['잎 수(장)'], marker_color=colors), row=1, col=2)
-    fig_growth.add_trace(go.Bar(x=agg_g.index, y=agg_g['지상부 길이(mm)'], marker_color=colors), row=2, col=1)
-    fig_growth.add_trace(go.Bar(x=agg_c.index, y=agg_c.values, marker_color=colors), row=2, col=2)
+    if data.all_growth.empty:
+        st.warning("생육 결과 데이터를 불러오지 못했습니다.")
+    else:
+        # 핵심 통계
+        st.info(f"💡 **{best_school}(EC {best_ec})**에서 생중량이 가장 높게 나타나, 해당 농도가 최적임을 시사합니다.")
     
-    fig_growth.update_layout(height=700, font=dict(family="Malgun Gothic"), showlegend=False)
-    st.plotly_chart(fig_growth, use_container_width=True)
-
-    with st.expander("원본 데이터 및 Excel 다운로드"):
-        st.dataframe(all_growth)
-        output = io.BytesIO()
-        with pd.ExcelWriter(output, engine='openpyxl') as writer:
-            all_growth.to_excel(writer, index=False)
-        st.download_button("Excel 다운로드", output.getvalue(), "growth_results.xlsx")
+        st.plotly_chart(build_growth_fig(data.growth_agg), use_container_width=True)
+
+        with st.expander("원본 데이터 및 Excel 다운로드"):
+            st.dataframe(data.all_growth)
+            st.download_button("Excel 다운로드", growth_xlsx_bytes(data.all_growth), "growth_results.xlsx")
+            st.download_button("Parquet 다운로드", growth_parquet_bytes(data.all_growth), "growth_results.parquet")
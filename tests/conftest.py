@@ -0,0 +1,7 @@
+import sys
+from pathlib import Path
+
+# 헬퍼 모듈(data_io.py)은 저장소 루트에 있으므로 import 경로에 추가
+# (main.py는 import 시 앱 전체가 실행되므로 테스트에서 import하지 않음)
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
@@ -0,0 +1,86 @@
+import os
+
+import pandas as pd
+import pytest
+
+import data_io
+
+
+@pytest.fixture
+def src(tmp_path):
+    path = tmp_path / "source.csv"
+    path.write_text("a,b\n1,2\n", encoding="utf-8")
+    return path
+
+
+def test_load_or_cache_writes_and_reuses_parquet(src, tmp_path):
+    cache_dir = tmp_path / ".cache"
+    calls = []
+
+    def reader(path):
+        calls.append(path)
+        return pd.read_csv(path)
+
+    first = data_io.load_or_cache(src, cache_dir, "source", reader)
+    second = data_io.load_or_cache(src, cache_dir, "source", reader)
+
+    assert data_io.cache_path(cache_dir, "source", src).exists()
+    assert len(calls) == 1
+    pd.testing.assert_frame_equal(first, second)
+    assert not [p for p in cache_dir.iterdir() if p.suffix == ".tmp"]
+
+
+def test_source_with_older_mtime_invalidates_cache(src, tmp_path):
+    cache_dir = tmp_path / ".cache"
+    data_io.load_or_cache(src, cache_dir, "source", pd.read_csv)
+    old_cache = data_io.cache_path(cache_dir, "source", src)
+
+    # 더 오래된 mtime을 가진 파일로 원본이 교체된 경우
+    mtime = src.stat().st_mtime - 100
+    src.write_text("a,b\n3,4\n5,6\n", encoding="utf-8")
+    os.utime(src, (mtime, mtime))
+
+    df = data_io.load_or_cache(src, cache_dir, "source", pd.read_csv)
+
+    assert df.to_dict("list") == {"a": [3, 5], "b": [4, 6]}
+    # 이전 키의 캐시는 정리됨
+    assert not old_cache.exists()
+    assert list(cache_dir.iterdir()) == [data_io.cache_path(cache_dir, "source", src)]
+
+
+def test_cache_version_bump_invalidates_cache(src, tmp_path, monkeypatch):
+    cache_dir = tmp_path / ".cache"
+    data_io.load_or_cache(src, cache_dir, "source", pd.read_csv)
+    monkeypatch.setattr(data_io, "CACHE_VERSION", data_io.CACHE_VERSION + 1)
+    calls = []
+
+    def reader(path):
+        calls.append(path)
+        return pd.read_csv(path)
+
+    data_io.load_or_cache(src, cache_dir, "source", reader)
+
+    assert len(calls) == 1
+
+
+def test_corrupt_cache_falls_back_to_source(src, tmp_path):
+    cache_dir = tmp_path / ".cache"
+    cache = data_io.cache_path(cache_dir, "source", src)
+    cache_dir.mkdir()
+    cache.write_bytes(b"not a parquet file")
+
+    df = data_io.load_or_cache(src, cache_dir, "source", pd.read_csv)
+
+    assert df.to_dict("list") == {"a": [1], "b": [2]}
+    # 손상된 캐시는 정상 파일로 교체됨
+    pd.testing.assert_frame_equal(pd.read_parquet(cache), df)
+
+
+def test_unconvertible_frame_skips_cache(tmp_path):
+    cache = tmp_path / ".cache" / "mixed.parquet"
+    df = pd.DataFrame({"mixed": pd.Series([1, "a"], dtype=object)})
+
+    data_io.write_cache(df, cache)
+
+    assert not cache.exists()
+    assert not list(cache.parent.iterdir())
@@ -0,0 +1,16 @@
+import unicodedata
+
+import data_io
+
+
+def test_index_uses_nfc_names_and_skips_hidden_dirs(tmp_path):
+    # macOS에서 복사된 파일명은 NFD로 저장될 수 있음
+    nfd_name = unicodedata.normalize("NFD", "송도고_환경데이터.csv")
+    (tmp_path / "sub").mkdir()
+    (tmp_path / "sub" / nfd_name).write_text("time,ec\n")
+    (tmp_path / ".cache").mkdir()
+    (tmp_path / ".cache" / "hidden.csv").write_text("")
+
+    index = data_io.build_file_index(tmp_path)
+
+    assert index == {unicodedata.normalize("NFC", nfd_name): tmp_path / "sub" / nfd_name}
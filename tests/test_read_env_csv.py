@@ -0,0 +1,38 @@
+import pytest
+
+import data_io
+
+
+@pytest.fixture
+def cp949_csv(tmp_path):
+    # 한글이 값 컬럼에만 있는 CP949 파일 (UTF-8로 읽으면 binary로 추론됨)
+    path = tmp_path / "cp949.csv"
+    path.write_bytes(
+        "time,temperature,humidity,ph,ec,memo\n"
+        "2025-05-01 5:00:00,21.1,48.1,6.6,1.0,한글메모\n".encode("cp949")
+    )
+    return path
+
+
+def test_cp949_value_column_is_decoded(cp949_csv):
+    df = data_io.read_env_csv(cp949_csv)
+
+    assert df.loc[0, "memo"] == "한글메모"
+    assert df.loc[0, "temperature"] == pytest.approx(21.1)
+
+
+def test_cp949_time_column_is_decoded(tmp_path):
+    path = tmp_path / "cp949_time.csv"
+    path.write_bytes("time,ec\n2025.5.1 오전,1.0\n".encode("cp949"))
+
+    assert data_io.read_env_csv(path).loc[0, "time"] == "2025.5.1 오전"
+
+
+def test_utf8_bom_csv(tmp_path):
+    path = tmp_path / "utf8.csv"
+    path.write_bytes("time,ec,memo\n2025-05-01 5:00:00,1.0,한글\n".encode("utf-8-sig"))
+
+    df = data_io.read_env_csv(path)
+
+    assert list(df.columns) == ["time", "ec", "memo"]
+    assert df.loc[0, "memo"] == "한글"